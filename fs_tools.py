@@ -1,31 +1,281 @@
+import mmap
+import multiprocessing
 import os
-from typing import List, Dict, Optional
-from datetime import datetime
+import re
+import threading
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 
 try:
     import importlib
-    pdf_module = importlib.import_module("PyPDF2")
+    try:
+        pdf_module = importlib.import_module("pypdf")
+    except Exception:
+        # fall back to the deprecated PyPDF2 if pypdf is not installed
+        pdf_module = importlib.import_module("PyPDF2")
     PdfReader = getattr(pdf_module, "PdfReader", None)
 except Exception:
     PdfReader = None
 
+try:
+    import importlib
+    pdfium = importlib.import_module("pypdfium2")
+except Exception:
+    pdfium = None
+
 try:
     import importlib
     docx = importlib.import_module("docx")
 except Exception:
     docx = None
 
+try:
+    import importlib
+    etree = importlib.import_module("lxml.etree")
+except Exception:
+    etree = None
+
+try:
+    import importlib
+    ahocorasick = importlib.import_module("ahocorasick")
+except Exception:
+    ahocorasick = None
+
+
+def _format_mtime(mtime: float) -> str:
+    # ISO 8601 local time to the second, without building a datetime object
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(mtime))
+
 
-def _file_metadata(path: str) -> Dict:
-    st = os.stat(path)
+def _file_metadata(path: str, st: Optional[os.stat_result] = None) -> Dict:
+    if st is None:
+        st = os.stat(path)
     return {
         "name": os.path.basename(path),
         "path": os.path.abspath(path),
         "size": st.st_size,
-        "modified": datetime.fromtimestamp(st.st_mtime).isoformat(),
+        "modified": _format_mtime(st.st_mtime),
     }
 
 
+# PDFs with at least this many pages have their text extracted on a process
+# pool; below it, pool start-up and IPC cost more than they save.
+_PDF_PARALLEL_MIN_PAGES = 8
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+_pdf_executor_lock = threading.Lock()
+_pdfium_lock = threading.Lock()
+
+
+def _page_text(page) -> str:
+    try:
+        try:
+            # "plain" skips layout mode's glyph positioning pass; resumes only need the text
+            return page.extract_text(extraction_mode="plain") or ""
+        except TypeError:
+            # PyPDF2 and pypdf<3.17 have no extraction_mode (and are always plain)
+            return page.extract_text() or ""
+    except Exception:
+        # older pypdf/PyPDF2 versions may raise on some pages
+        return ""
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """Worker: open the PDF independently and extract text for pages [start, stop)."""
+    with open(path, "rb") as f:
+        reader = PdfReader(f)
+        return [_page_text(reader.pages[i]) for i in range(start, stop)]
+
+
+def _pdfium_text(path: str) -> str:
+    """Extract text with PDFium (C++); much faster than pypdf's pure-Python parser."""
+    text_parts: List[str] = []
+    # PDFium is not thread-safe, and handle_query reads files from a thread pool
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(path)
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                try:
+                    text_parts.append(textpage.get_text_range())
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+    # PDFium separates lines with CRLF; keep "\n" like the pypdf path
+    return "\n".join(text_parts).replace("\r\n", "\n").strip()
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            # read_file runs on handle_query's thread pool; forking a threaded
+            # process can deadlock, so start workers via forkserver (or spawn)
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pdf_executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context(method))
+        return _pdf_executor
+
+
+def _extract_pages_parallel(path: str, n_pages: int) -> List[str]:
+    """
+    Extract page text across worker processes, preserving page order.
+
+    Pages are split into one contiguous range per worker so each process parses
+    the PDF's cross-reference table once rather than once per page.
+    """
+    workers = os.cpu_count() or 1
+    step = max(1, -(-n_pages // workers))
+    ranges = [(s, min(s + step, n_pages)) for s in range(0, n_pages, step)]
+    try:
+        executor = _get_pdf_executor()
+        chunks = executor.map(
+            _extract_page_range,
+            [path] * len(ranges),
+            [r[0] for r in ranges],
+            [r[1] for r in ranges],
+        )
+        return [text for chunk in chunks for text in chunk]
+    except (OSError, BrokenProcessPool):
+        # no usable process pool here (e.g. restricted sandbox); extract in-process
+        return _extract_page_range(path, 0, n_pages)
+
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_NS = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+# Text equivalents of run content, as python-docx's Run.text maps them
+# (w:br only for line breaks; page/column breaks give "")
+_DOCX_RUN_TEXT = {
+    _W_NS + "tab": "\t",
+    _W_NS + "ptab": "\t",
+    _W_NS + "cr": "\n",
+    _W_NS + "noBreakHyphen": "-",
+}
+
+if etree is not None:
+    _W_NSMAP = {"w": _W_NS[1:-1], "mc": _MC_NS[1:-1]}
+    # every paragraph once, including table cells and text boxes; Word writes
+    # each text box twice, so the mc:Fallback copy is skipped
+    _DOCX_PARAGRAPHS = etree.XPath("//w:p[not(ancestor::mc:Fallback)]", namespaces=_W_NSMAP)
+    # document.xml is untrusted input: never resolve external entities or fetch
+    # over the network (older lxml defaults did), matching python-docx's parser
+    _DOCX_PARSER = etree.XMLParser(resolve_entities=False, no_network=True)
+
+
+def _iter_docx_paragraphs(el):
+    """ElementTree equivalent of _DOCX_PARAGRAPHS: w:p elements in document order."""
+    for child in el:
+        if child.tag == _MC_NS + "Fallback":
+            continue
+        if child.tag == _W_NS + "p":
+            yield child
+        yield from _iter_docx_paragraphs(child)
+
+
+def _docx_paragraph_text(p) -> str:
+    """
+    Text of a paragraph's own runs (w:r and w:hyperlink/w:r children), like
+    python-docx's Paragraph.text. Runs of nested text-box paragraphs are not
+    included; those paragraphs are emitted on their own.
+    """
+    parts: List[str] = []
+    for child in p:
+        if child.tag == _W_NS + "hyperlink":
+            runs = [r for r in child if r.tag == _W_NS + "r"]
+        elif child.tag == _W_NS + "r":
+            runs = [child]
+        else:
+            continue
+        for r in runs:
+            for el in r:
+                if el.tag == _W_NS + "t":
+                    parts.append(el.text or "")
+                elif el.tag == _W_NS + "br":
+                    if el.get(_W_NS + "type", "textWrapping") == "textWrapping":
+                        parts.append("\n")
+                else:
+                    parts.append(_DOCX_RUN_TEXT.get(el.tag, ""))
+    return "".join(parts)
+
+
+def _docx_text_fast(path: str) -> str:
+    """
+    Read paragraph text straight from word/document.xml, without building
+    python-docx's object model. Uses lxml's compiled XPath when available,
+    otherwise the stdlib ElementTree; both give the same text.
+    """
+    with zipfile.ZipFile(path) as z:
+        with z.open("word/document.xml") as xml:
+            tree = etree.parse(xml, _DOCX_PARSER) if etree is not None else ET.parse(xml)
+    if etree is not None:
+        paragraphs = _DOCX_PARAGRAPHS(tree)
+    else:
+        paragraphs = _iter_docx_paragraphs(tree.getroot())
+    return "\n".join(_docx_paragraph_text(p) for p in paragraphs).strip()
+
+
+@lru_cache(maxsize=256)
+def _extract_content_cached(path: str, ext: str, mtime_ns: int, size: int) -> str:
+    """
+    Extract text from a file. Cached on (path, mtime, size) so unchanged files
+    are parsed only once; a modified file gets a new key and is re-read.
+
+    Raises on failure so errors are never cached.
+    """
+    if ext == ".pdf":
+        if pdfium is not None:
+            return _pdfium_text(path)
+        with open(path, "rb") as f:
+            reader = PdfReader(f)
+            n_pages = len(reader.pages)
+            if n_pages < _PDF_PARALLEL_MIN_PAGES:
+                text_parts = [_page_text(page) for page in reader.pages]
+            else:
+                text_parts = None
+        if text_parts is None:
+            text_parts = _extract_pages_parallel(path, n_pages)
+        return "\n".join(text_parts).strip()
+
+    if ext in (".docx", ".doc"):
+        try:
+            return _docx_text_fast(path)
+        except Exception as e:
+            if docx is None:
+                raise RuntimeError(f"python-docx not installed ({e})") from e
+        doc = docx.Document(path)
+        paragraphs = [p.text for p in doc.paragraphs]
+        return "\n".join(paragraphs).strip()
+
+    # treat as text file: one unbuffered read sized from stat, decoded once
+    return _read_text(path, size)
+
+
+def _read_text(path: str, size: int) -> str:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        chunks = [os.read(fd, max(size, 1))]
+        # keep reading in case the file grew since it was stat'ed
+        while chunks[-1]:
+            chunks.append(os.read(fd, 1 << 16))
+    finally:
+        os.close(fd)
+    data = chunks[0] if len(chunks) <= 2 else b"".join(chunks)
+    text = data.decode("utf-8", "replace")
+    if "\r" in text:
+        # match text-mode open()'s universal newline translation
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
 def read_file(filepath: str) -> Dict:
     """
     Read a resume file (PDF, TXT, DOCX) and return a dict with content and metadata.
@@ -38,54 +288,25 @@ def read_file(filepath: str) -> Dict:
 
     _, ext = os.path.splitext(filepath)
     ext = ext.lower()
-    metadata = _file_metadata(filepath)
-
-    try:
-        if ext == ".pdf":
-            if PdfReader is None:
-                return {"content": None, "metadata": metadata, "error": "PyPDF2 not installed"}
-            text_parts: List[str] = []
-            with open(filepath, "rb") as f:
-                reader = PdfReader(f)
-                for page in reader.pages:
-                    try:
-                        text = page.extract_text() or ""
-                    except Exception:
-                        # older PyPDF2 versions may raise on some pages
-                        text = ""
-                    text_parts.append(text)
-            content = "\n".join(text_parts).strip()
-            return {"content": content, "metadata": metadata, "error": None}
-
-        elif ext in (".docx", ".doc"):
-            if docx is None:
-                return {"content": None, "metadata": metadata, "error": "python-docx not installed"}
-            try:
-                doc = docx.Document(filepath)
-                paragraphs = [p.text for p in doc.paragraphs]
-                content = "\n".join(paragraphs).strip()
-                return {"content": content, "metadata": metadata, "error": None}
-            except Exception as e:
-                return {"content": None, "metadata": metadata, "error": str(e)}
+    st = os.stat(filepath)
+    metadata = _file_metadata(filepath, st)
 
-        else:
-            # treat as text file
-            try:
-                with open(filepath, "r", encoding="utf-8", errors="replace") as f:
-                    content = f.read()
-                return {"content": content, "metadata": metadata, "error": None}
-            except Exception as e:
-                return {"content": None, "metadata": metadata, "error": str(e)}
+    if ext == ".pdf" and pdfium is None and PdfReader is None:
+        return {"content": None, "metadata": metadata, "error": "pypdf not installed"}
 
+    try:
+        content = _extract_content_cached(metadata["path"], ext, st.st_mtime_ns, st.st_size)
+        return {"content": content, "metadata": metadata, "error": None}
     except Exception as e:
         return {"content": None, "metadata": metadata, "error": str(e)}
 
 
-def list_files(directory: str, extension: Optional[str] = None) -> List[Dict]:
+def list_files_soa(directory: str, extension: Optional[str] = None, with_mtime: bool = True) -> Dict:
     """
-    List all files in a directory. Optionally filter by extension (e.g., '.pdf', '.txt').
+    Columnar variant of list_files: one dict of parallel arrays instead of a dict per file.
 
-    Returns a list of metadata dicts for each file.
+    Returns: {"names": [str], "paths": [str], "sizes": array('q'), "modified": [str]}
+    ("modified" only when with_mtime is True).
     """
     if not os.path.isdir(directory):
         raise FileNotFoundError(f"Not a directory: {directory}")
@@ -96,15 +317,43 @@ def list_files(directory: str, extension: Optional[str] = None) -> List[Dict]:
         if not ext.startswith('.'): 
             ext = '.' + ext
 
-    results = []
-    for entry in os.scandir(directory):
-        if not entry.is_file():
-            continue
-        if ext and os.path.splitext(entry.name)[1].lower() != ext:
-            continue
-        results.append(_file_metadata(entry.path))
+    names: List[str] = []
+    paths: List[str] = []
+    sizes = array("q")
+    modified: List[str] = []
+    # scanning the absolute path makes entry.path absolute, so no per-entry abspath
+    with os.scandir(os.path.abspath(directory)) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            if ext and not entry.name.lower().endswith(ext):
+                continue
+            st = entry.stat()
+            names.append(entry.name)
+            paths.append(entry.path)
+            sizes.append(st.st_size)
+            if with_mtime:
+                modified.append(_format_mtime(st.st_mtime))
 
-    return results
+    columns = {"names": names, "paths": paths, "sizes": sizes}
+    if with_mtime:
+        columns["modified"] = modified
+    return columns
+
+
+def list_files(directory: str, extension: Optional[str] = None, with_mtime: bool = True) -> List[Dict]:
+    """
+    List all files in a directory. Optionally filter by extension (e.g., '.pdf', '.txt').
+
+    Returns a list of metadata dicts for each file. Pass with_mtime=False to skip
+    the "modified" timestamp when it isn't needed.
+    """
+    cols = list_files_soa(directory, extension, with_mtime)
+    keys = ("name", "path", "size", "modified") if with_mtime else ("name", "path", "size")
+    columns = [cols["names"], cols["paths"], cols["sizes"]]
+    if with_mtime:
+        columns.append(cols["modified"])
+    return [dict(zip(keys, row)) for row in zip(*columns)]
 
 
 def write_file(filepath: str, content: str) -> Dict:
@@ -124,34 +373,168 @@ def write_file(filepath: str, content: str) -> Dict:
         return {"ok": False, "path": filepath, "error": str(e)}
 
 
-def search_in_file(filepath: str, keyword: str, context_chars: int = 50) -> Dict:
+@lru_cache(maxsize=128)
+def _keyword_pattern(term: str) -> "re.Pattern[str]":
+    """Compiled case-insensitive literal pattern, reused across files for the same keyword."""
+    return re.compile(re.escape(term), re.IGNORECASE)
+
+
+# Plain-text files above this size are searched through mmap instead of being
+# decoded into a str (and kept in the content cache). This bounds memory, not
+# CPU: with many matches the per-match offset bookkeeping makes it slower than
+# the str path, so it is reserved for files where a full copy is costly.
+_MMAP_MIN_SIZE = 16 << 20
+
+
+def _is_large_text_file(filepath: str) -> bool:
+    if os.path.splitext(filepath)[1].lower() in (".pdf", ".docx", ".doc"):
+        return False
+    try:
+        return os.stat(filepath).st_size > _MMAP_MIN_SIZE
+    except OSError:
+        return False
+
+
+@lru_cache(maxsize=128)
+def _keyword_pattern_bytes(term: str) -> "re.Pattern[bytes]":
+    return re.compile(re.escape(term.encode("ascii")), re.IGNORECASE)
+
+
+def _search_mmap(filepath: str, term: str, context_chars: int, limit: Optional[int] = None) -> Dict:
+    """
+    search_in_file for large text files and ASCII keywords: the regex runs over
+    the page cache via mmap, and only matches and their context are decoded.
+
+    Offsets are converted to the character offsets read_file's text would give
+    (including U+FFFD replacements for invalid UTF-8) by decoding the bytes
+    between consecutive matches. Context windows are cut on byte boundaries.
+    """
+    try:
+        st = os.stat(filepath)
+        metadata = _file_metadata(filepath, st)
+        matches = []
+        with open(filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            n = len(mm)
+            char_pos = 0
+            last = 0
+            for mo in _keyword_pattern_bytes(term).finditer(mm):
+                idx, end = mo.span()
+                # the keyword is ASCII, so segment boundaries never split a
+                # character and per-segment decoding matches a whole-file decode
+                segment = mm[last:idx]
+                if segment.isascii():
+                    char_pos += len(segment) - segment.count(b"\r\n")
+                else:
+                    char_pos += len(segment.decode("utf-8", "replace")) - segment.count(b"\r\n")
+                last = idx
+                before = max(0, idx - context_chars)
+                raw = mm[before:min(n, end + context_chars)]
+                context = raw.decode("utf-8", "ignore")
+                if "\r" in context:
+                    context = context.replace("\r\n", "\n").replace("\r", "\n")
+                match = raw[idx - before:end - before].decode("ascii")
+                matches.append({"start": char_pos, "end": char_pos + (end - idx), "match": match, "context": context})
+                if limit and len(matches) >= limit:
+                    break
+        return {"matches": matches, "metadata": metadata, "error": None}
+    except Exception as e:
+        return {"matches": [], "metadata": None, "error": str(e)}
+
+
+def search_in_file(filepath: str, keyword: str, context_chars: int = 50, limit: Optional[int] = None) -> Dict:
     """
-    Search for keyword in file content. Case-insensitive.
+    Search for keyword in file content. Case-insensitive. Stops after `limit`
+    matches when given (e.g. limit=1 to only test whether the file contains it).
 
     Returns: {"matches": [{"start": int, "end": int, "match": str, "context": str}], "metadata": {...}, "error": Optional[str]}
     """
+    term = (keyword or "").lower()
+    if term and term.isascii() and _is_large_text_file(filepath):
+        return _search_mmap(filepath, term, context_chars, limit)
+
     res = read_file(filepath)
     if res.get("error"):
         return {"matches": [], "metadata": res.get("metadata"), "error": res.get("error")}
 
     content = res.get("content") or ""
-    lowered = content.lower()
-    term = (keyword or "").lower()
     matches = []
     if term == "":
         return {"matches": [], "metadata": res.get("metadata"), "error": "Empty keyword"}
 
-    start = 0
-    while True:
-        idx = lowered.find(term, start)
-        if idx == -1:
+    # Cheap rejection: most files in a skill search don't match at all. For ASCII
+    # text (str.isascii() is O(1)), a match needs the term's first character in
+    # one of its two cases, and `in` is a C-level scan.
+    first = term[0]
+    if content.isascii() and first not in content and first.upper() not in content:
+        return {"matches": [], "metadata": res.get("metadata"), "error": None}
+
+    pattern = _keyword_pattern(term)
+    n = len(content)
+    for mo in pattern.finditer(content):
+        idx, end = mo.span()
+        before = max(0, idx - context_chars)
+        after = min(n, end + context_chars)
+        matches.append({"start": idx, "end": end, "match": mo.group(), "context": content[before:after]})
+        if limit and len(matches) >= limit:
             break
-        end = idx + len(term)
+
+    return {"matches": matches, "metadata": res.get("metadata"), "error": None}
+
+
+@lru_cache(maxsize=32)
+def _keyword_automaton(terms: Tuple[str, ...]):
+    """Aho-Corasick automaton over lowercased terms, reused across files."""
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        automaton.add_word(term, term)
+    automaton.make_automaton()
+    return automaton
+
+
+def search_many_in_file(filepath: str, keywords: List[str], context_chars: int = 50) -> Dict:
+    """
+    Search for several keywords in one pass over the file content. Case-insensitive.
+
+    Uses an Aho-Corasick automaton when pyahocorasick is installed (and lowercasing
+    keeps offsets aligned), otherwise one regex scan per keyword. Both give the
+    same matches; matches of the same keyword don't overlap, as with search_in_file.
+
+    Returns: {"matches": [{"keyword": str, "start": int, "end": int, "match": str, "context": str}], "metadata": {...}, "error": Optional[str]}
+    """
+    res = read_file(filepath)
+    if res.get("error"):
+        return {"matches": [], "metadata": res.get("metadata"), "error": res.get("error")}
+
+    terms = tuple(dict.fromkeys(t.lower() for t in (keywords or []) if t))
+    if not terms:
+        return {"matches": [], "metadata": res.get("metadata"), "error": "Empty keyword"}
+
+    content = res.get("content") or ""
+    n = len(content)
+    spans = []
+    lowered = content.lower() if ahocorasick is not None else None
+    # str.lower() can change length (e.g. "İ" -> "i̇"), which would shift the
+    # automaton's offsets against content; use the regex scan in that case
+    if lowered is not None and len(lowered) == len(content):
+        last_end: Dict[str, int] = {}
+        for end_idx, term in _keyword_automaton(terms).iter(lowered):
+            idx = end_idx - len(term) + 1
+            if idx < last_end.get(term, 0):
+                continue
+            last_end[term] = end_idx + 1
+            spans.append((idx, end_idx + 1, term))
+    else:
+        for term in terms:
+            spans.extend((mo.start(), mo.end(), term) for mo in _keyword_pattern(term).finditer(content))
+
+    spans.sort(key=lambda span: (span[0], span[1]))
+    matches = []
+    for idx, end, term in spans:
         before = max(0, idx - context_chars)
-        after = min(len(content), end + context_chars)
-        context = content[before:after]
-        matches.append({"start": idx, "end": end, "match": content[idx:end], "context": context})
-        start = end
+        after = min(n, end + context_chars)
+        matches.append({"keyword": term, "start": idx, "end": end, "match": content[idx:end], "context": content[before:after]})
 
     return {"matches": matches, "metadata": res.get("metadata"), "error": None}
 
@@ -162,6 +545,20 @@ if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1:
         path = sys.argv[1]
-        print(read_file(path))
+        out = read_file(path)
+        try:
+            import orjson
+            # serialize up front so a failure leaves no partial output; orjson raises
+            # TypeError on strings json accepts (e.g. lone surrogates from pypdf)
+            data = orjson.dumps(out, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        except (ImportError, TypeError):
+            data = None
+        if data is not None:
+            sys.stdout.flush()
+            sys.stdout.buffer.write(data)
+        else:
+            import json
+            json.dump(out, sys.stdout, indent=2)
+            sys.stdout.write("\n")
     else:
         print("Usage: python fs_tools.py <path-to-file>")
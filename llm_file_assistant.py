@@ -1,14 +1,23 @@
+import asyncio
+import heapq
 import os
 import re
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Dict, Optional
 
-from fs_tools import read_file, list_files, write_file, search_in_file
+from fs_tools import read_file, list_files, list_files_soa, write_file, search_in_file, search_many_in_file
 
 try:
     import openai
 except Exception:
     openai = None
 
+_RE_FOLDER = re.compile(r"in the ([\w\-_/\. ]+) folder")
+_RE_SKILL = re.compile(r"find resumes mentioning ([\w\+\#\-, ]+)")
+_RE_SUMMARY = re.compile(r"create a summary file for ([\w\-_. ]+\.[a-z0-9]+)")
+
+_SUMMARY_KEYWORDS = ("skill", "experience", "python", "java", "c++", "machine learning")
+
 
 def _simple_intent_parser(query: str) -> Dict:
     """
@@ -16,21 +25,21 @@ def _simple_intent_parser(query: str) -> Dict:
 
     Recognizes:
       - read all resumes in the X folder
-      - find resumes mentioning <skill>
+      - find resumes mentioning <skill>[, <skill>...]
       - create a summary file for <filename>
     """
     q = query.lower()
     if "read all" in q and "resume" in q:
-        m = re.search(r"in the ([\w\-_/\. ]+) folder", q)
+        m = _RE_FOLDER.search(q)
         folder = m.group(1).strip() if m else "resumes"
         return {"action": "read_all", "folder": folder}
 
-    m = re.search(r"find resumes mentioning ([\w\+\#\- ]+)", q)
-    if m:
-        term = m.group(1).strip()
-        return {"action": "find_skill", "term": term, "folder": "resumes"}
+    m = _RE_SKILL.search(q)
+    terms = [t.strip() for t in m.group(1).split(",") if t.strip()] if m else []
+    if terms:
+        return {"action": "find_skill", "term": terms[0], "terms": terms, "folder": "resumes"}
 
-    m = re.search(r"create a summary file for ([\w\-_. ]+\.[a-z0-9]+)", q)
+    m = _RE_SUMMARY.search(q)
     if m:
         filename = m.group(1).strip()
         return {"action": "create_summary", "filename": filename, "folder": "resumes"}
@@ -39,34 +48,105 @@ def _simple_intent_parser(query: str) -> Dict:
     return {"action": "unknown", "query": query}
 
 
+def _llm_enabled() -> bool:
+    return bool(openai and os.environ.get("OPENAI_API_KEY"))
+
+
+def _summary_request(text: str, max_tokens: int) -> Dict:
+    """Keyword arguments for a chat completion that summarizes resume text."""
+    return {
+        "model": os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo"),
+        "messages": [
+            {"role": "system", "content": "You are a helpful assistant that summarizes resume content."},
+            {"role": "user", "content": f"Summarize the following resume text. Be concise and list top skills and a 2-line summary.\n\n{text[:8000]}"}
+        ],
+        "max_tokens": max_tokens,
+        "temperature": 0.2,
+    }
+
+
+def _heuristic_summary(text: str) -> str:
+    # simple heuristic: extract lines with keywords and the top 3 longest lines,
+    # in one pass with a 3-element min-heap; ties keep the earliest line
+    keywords = []
+    heap = []
+    for i, l in enumerate(text.splitlines()):
+        l = l.strip()
+        if not l:
+            continue
+        if len(keywords) < 5:
+            ll = l.lower()
+            if any(k in ll for k in _SUMMARY_KEYWORDS):
+                keywords.append(l)
+        item = (len(l), -i, l)
+        if len(heap) < 3:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    top_lines = [l for _, _, l in sorted(heap, reverse=True)]
+    parts = []
+    if keywords:
+        parts.append("Detected keyword lines: " + "; ".join(keywords[:5]))
+    parts.append("Top lines: " + " | ".join(top_lines))
+    return "\n".join(parts)
+
+
 def summarize_text_with_llm(text: str, max_tokens: int = 400) -> str:
     """
     Summarize using OpenAI if API key is present, otherwise return a short heuristic summary.
     """
-    if openai and os.environ.get("OPENAI_API_KEY"):
+    if _llm_enabled():
         try:
-            resp = openai.ChatCompletion.create(
-                model=os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo"),
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that summarizes resume content."},
-                    {"role": "user", "content": f"Summarize the following resume text. Be concise and list top skills and a 2-line summary.\n\n{text[:8000]}"}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.2,
-            )
+            resp = openai.ChatCompletion.create(**_summary_request(text, max_tokens))
             return resp.choices[0].message.content.strip()
         except Exception as e:
             return f"[LLM summarization failed: {e}]"
 
-    # simple heuristic: extract lines with keywords and the top 3 longest lines
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-    keywords = [l for l in lines if any(k in l.lower() for k in ["skill", "experience", "python", "java", "c++", "machine learning"]) ]
-    top_lines = sorted(lines, key=lambda s: len(s), reverse=True)[:3]
-    parts = []
-    if keywords:
-        parts.append("Detected keyword lines: " + "; ".join(keywords[:5]))
-    parts.append("Top lines: " + " | ".join(top_lines))
-    return "\n".join(parts)
+    return _heuristic_summary(text)
+
+
+async def _summarize_many(texts: List[str], max_tokens: int = 400, max_concurrency: int = 4) -> List[str]:
+    """
+    Summarize several texts with concurrent OpenAI requests, at most
+    max_concurrency in flight to stay under provider rate limits.
+
+    Same contract as summarize_text_with_llm per text, including the heuristic
+    fallback when no API key is configured; output order matches input order.
+    """
+    if not _llm_enabled():
+        return [_heuristic_summary(t) for t in texts]
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _gather(create) -> List[str]:
+        async def _one(text: str) -> str:
+            async with semaphore:
+                try:
+                    resp = await create(**_summary_request(text, max_tokens))
+                    return resp.choices[0].message.content.strip()
+                except Exception as e:
+                    return f"[LLM summarization failed: {e}]"
+
+        return list(await asyncio.gather(*[_one(t) for t in texts]))
+
+    if hasattr(openai, "AsyncOpenAI"):
+        # openai>=1.0 client API; close the client before the event loop goes away
+        async with openai.AsyncOpenAI() as client:
+            return await _gather(client.chat.completions.create)
+    return await _gather(openai.ChatCompletion.acreate)
+
+
+def _map_files(fn: Callable[[Any], Dict], files: List[Any]) -> List[Dict]:
+    """
+    Apply fn to each file entry (or path) on a thread pool, preserving input order.
+
+    Reading and parsing files is I/O-bound (and PDF/DOCX parsers release the GIL
+    on file access), so per-file work overlaps well across threads.
+    """
+    if not files:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(files))) as ex:
+        return list(ex.map(fn, files))
 
 
 def handle_query(query: str, use_llm_for_summary: bool = False) -> Dict:
@@ -78,20 +158,39 @@ def handle_query(query: str, use_llm_for_summary: bool = False) -> Dict:
 
     if action == "read_all":
         folder = intent.get("folder")
-        files = list_files(folder)
-        results = []
-        for f in files:
-            rf = read_file(f["path"]) if f.get("path") else read_file(os.path.join(folder, f.get("name")))
-            results.append({"file": f, "read": rf})
+        paths = list_files_soa(folder, with_mtime=False)["paths"]
+        reads = _map_files(read_file, paths)
+        results = {
+            "paths": paths,
+            "contents": [r.get("content") for r in reads],
+            "errors": [r.get("error") for r in reads],
+        }
+        if use_llm_for_summary:
+            readable = [i for i, r in enumerate(reads) if not r.get("error")]
+            summaries = asyncio.run(_summarize_many([results["contents"][i] or "" for i in readable]))
+            results["summaries"] = [None] * len(paths)
+            for i, summary in zip(readable, summaries):
+                results["summaries"][i] = summary
         return {"action": action, "folder": folder, "results": results}
 
+    if action == "find_skill" and len(intent.get("terms") or []) > 1:
+        terms = intent.get("terms")
+        folder = intent.get("folder")
+        files = list_files(folder, extension=None)
+        searches = _map_files(lambda f: search_many_in_file(f["path"], terms), files)
+        matches = []
+        for f, s in zip(files, searches):
+            if s.get("matches"):
+                matches.append({"file": f, "matches": s["matches"]})
+        return {"action": action, "terms": terms, "matches": matches}
+
     if action == "find_skill":
-        term = intent.get("term")
+        term = intent.get("terms")[0]
         folder = intent.get("folder")
+        files = list_files(folder, extension=None)
+        searches = _map_files(lambda f: search_in_file(f["path"], term), files)
         matches = []
-        for f in list_files(folder, extension=None):
-            path = f["path"]
-            s = search_in_file(path, term)
+        for f, s in zip(files, searches):
             if s.get("matches"):
                 matches.append({"file": f, "matches": s["matches"]})
         return {"action": action, "term": term, "matches": matches}
@@ -117,8 +216,21 @@ if __name__ == "__main__":
 
     p = argparse.ArgumentParser()
     p.add_argument("query", help="User query (e.g. 'Read all resumes in the resumes folder')")
-    p.add_argument("--use-llm", action="store_true", help="Use OpenAI LLM for summarization if API key present")
+    p.add_argument("--use-llm", action="store_true", help="Use OpenAI LLM for summarization if API key present (also summarizes each resume when reading all)")
     args = p.parse_args()
     out = handle_query(args.query, use_llm_for_summary=args.use_llm)
-    import json
-    print(json.dumps(out, indent=2))
+    import sys
+    try:
+        import orjson
+        # serialize up front so a failure leaves no partial output; orjson raises
+        # TypeError on strings json accepts (e.g. lone surrogates from pypdf)
+        data = orjson.dumps(out, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    except (ImportError, TypeError):
+        data = None
+    if data is not None:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(data)
+    else:
+        import json
+        json.dump(out, sys.stdout, indent=2)
+        sys.stdout.write("\n")